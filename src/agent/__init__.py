@@ -1,4 +1,5 @@
+from .checkpoint import ScraperCheckpoint
 from .extractor_agent import ExtractorAgent
 from .scraper_agent import ScraperAgent
 
-__all__ = ["ExtractorAgent", "ScraperAgent"]
+__all__ = ["ExtractorAgent", "ScraperAgent", "ScraperCheckpoint"]
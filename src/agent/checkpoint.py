@@ -0,0 +1,107 @@
+import gzip
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import dspy
+
+from src.jobs import job_id
+
+
+class ScraperCheckpoint:
+    """Persists the progress of a ScraperAgent run as a gzip-compressed JSON file."""
+
+    def __init__(self, path: str):
+        """
+        Initializes the checkpoint store.
+
+        Args:
+            path (str): File the checkpoint is written to and resumed from.
+        """
+        self.path = path
+
+    @classmethod
+    def for_job(
+        cls, url: str, user_task: str, directory: str = "checkpoints"
+    ) -> "ScraperCheckpoint":
+        """Creates a checkpoint whose file name is derived from the URL and task, so re-running the same job resumes it."""
+        return cls(os.path.join(directory, f"{job_id(url, user_task)}.json.gz"))
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Returns the saved checkpoint, or None if there is nothing to resume."""
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, EOFError, ValueError):
+            # Missing, truncated or corrupt checkpoints start the run fresh
+            return None
+
+    def save(self, data: Dict[str, Any]):
+        """Atomically writes the checkpoint, replacing any previous one."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), default=str)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Removes the checkpoint file once the run no longer needs it."""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class ResumableReAct(dspy.ReAct):
+    """A ReAct module that can continue an existing trajectory and reports every completed step."""
+
+    async def aforward(
+        self,
+        trajectory: Optional[Dict[str, Any]] = None,
+        on_step: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        **input_args,
+    ):
+        trajectory = dict(trajectory or {})
+        max_iters = input_args.pop("max_iters", self.max_iters)
+
+        # Each completed step holds a thought, tool name, tool args and observation
+        start_idx = len(trajectory) // 4
+        finished = trajectory.get(f"tool_name_{start_idx - 1}") == "finish"
+
+        for idx in range(start_idx, max_iters):
+            if finished:
+                break
+
+            try:
+                pred = await self._async_call_with_potential_trajectory_truncation(
+                    self.react, trajectory, **input_args
+                )
+            except ValueError as err:
+                print(
+                    f"Ending the trajectory: agent failed to select a valid tool: {err}"
+                )
+                break
+
+            trajectory[f"thought_{idx}"] = pred.next_thought
+            trajectory[f"tool_name_{idx}"] = pred.next_tool_name
+            trajectory[f"tool_args_{idx}"] = pred.next_tool_args
+
+            try:
+                trajectory[f"observation_{idx}"] = await self.tools[
+                    pred.next_tool_name
+                ].acall(**pred.next_tool_args)
+            except Exception as err:
+                trajectory[f"observation_{idx}"] = (
+                    f"Execution error in {pred.next_tool_name}: {err}"
+                )
+
+            if on_step:
+                await on_step(trajectory)
+
+            finished = pred.next_tool_name == "finish"
+
+        extract = await self._async_call_with_potential_trajectory_truncation(
+            self.extract, trajectory, **input_args
+        )
+        return dspy.Prediction(trajectory=trajectory, **extract)
@@ -1,7 +1,8 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import dspy
 
+from src.agent.checkpoint import ResumableReAct, ScraperCheckpoint
 from src.scraper.webscraper import WebScraper
 from src.scraper.webtools import WebInteractionTools
 
@@ -46,24 +47,72 @@ class ScraperAgent(dspy.Module):
         web_scraper: WebScraper,
         interaction_tools: WebInteractionTools,
         state: Dict[str, Any],
+        checkpoint: Optional[ScraperCheckpoint] = None,
     ):
         super().__init__()
         self.scraper = web_scraper
         self.tools = interaction_tools
         self.shared_state = state  # Store reference to the shared state object
-        self.agent = dspy.ReAct(
+        self.checkpoint = checkpoint
+        self.agent = ResumableReAct(
             signature=ScraperAgentSignature, tools=self._get_tools()
         )
 
     async def aforward(self, full_content: str, user_task: str):
-        return await self.agent.acall(html_content=full_content, task=user_task)
+        trajectory = None
+        if self.checkpoint:
+            saved = self.checkpoint.load()
+            if saved:
+                trajectory = await self._restore_checkpoint(saved)
+
+        result = await self.agent.acall(
+            html_content=full_content,
+            task=user_task,
+            trajectory=trajectory,
+            on_step=self._save_checkpoint if self.checkpoint else None,
+        )
+
+        # The run completed, so there is nothing left to resume
+        if self.checkpoint:
+            self.checkpoint.clear()
+        return result
+
+    async def _save_checkpoint(self, trajectory: Dict[str, Any]):
+        """
+        Checkpoints the trajectory together with the browser and form state after each step.
+        Checkpointing is best-effort: a failed snapshot (e.g. while a page is still loading)
+        keeps the previous checkpoint and never interrupts the run.
+        """
+        try:
+            self.checkpoint.save(
+                {
+                    "trajectory": trajectory,
+                    "browser": await self.scraper.export_state(),
+                    "form_values": self.tools.form_values,
+                    "shared_state": self.shared_state,
+                }
+            )
+        except Exception as e:
+            print(f"Failed to save checkpoint, continuing without it: {e}")
+
+    async def _restore_checkpoint(self, saved: Dict[str, Any]) -> Dict[str, Any]:
+        """Restores the browser and form state of a checkpoint and returns its trajectory."""
+        trajectory = saved.get("trajectory", {})
+        print(f"Resuming from checkpoint after {len(trajectory) // 4} step(s)...")
+        await self.scraper.restore_state(saved["browser"])
+        await self.tools.restore_form_values(saved.get("form_values", {}))
+        self.shared_state.update(saved.get("shared_state", {}))
+        return trajectory
 
     async def _store_and_finish(self, css_selector: str) -> str:
         """
         Retrieves the HTML content of the given selector and stores it in the shared state, then finishes the task.
         """
         print("Storing final HTML content...")
-        final_html = await self.scraper.get_body_content(css_selector=css_selector)
+        # Captured once, uncapped and uncached; only this reference is kept
+        final_html = await self.scraper.get_outer_html(css_selector, wait=True)
+        if final_html is None:
+            return f"Error: Element with selector '{css_selector}' not found. Nothing was stored."
         self.shared_state["final_html"] = final_html
         return f"Successfully retrieved and stored the HTML content from selector '{css_selector}'. The task is complete."
 
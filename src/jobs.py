@@ -0,0 +1,6 @@
+import hashlib
+
+
+def job_id(url: str, user_task: str) -> str:
+    """Identifies a scraping job by its URL and task, so re-running the same job finds its files."""
+    return hashlib.sha256(f"{url}\n{user_task}".encode("utf-8")).hexdigest()[:16]
@@ -8,12 +8,14 @@ import dspy
 from dotenv import load_dotenv
 from dspy.utils.callback import BaseCallback
 
-from agent import ExtractorAgent, ScraperAgent
+from agent import ExtractorAgent, ScraperAgent, ScraperCheckpoint
 from scraper import WebInteractionTools, WebScraper
 
 load_dotenv()
 API_KEY = os.environ["API_KEY"]
 MODEL_NAME = os.environ["MODEL_NAME"]
+# Keeps intermediate HTML observations from flooding the scraper agent's context
+MAX_OBSERVATION_BYTES = 500_000
 
 
 class ToolLoggingCallback(BaseCallback):
@@ -65,9 +67,11 @@ async def main():
         lm=model, allow_async=True, callbacks=[logger], adapter=dspy.JSONAdapter()
     )
 
-    async with WebScraper(url_input, headless=True) as scraper:
+    async with WebScraper(
+        url_input, headless=True, max_observation_bytes=MAX_OBSERVATION_BYTES
+    ) as scraper:
         initial_content = await scraper.get_body_content()
-        webtools = WebInteractionTools(scraper.tab)
+        webtools = WebInteractionTools(scraper.tab, scraper=scraper)
 
         # Create a shared state dictionary to be kept by ScraperAgent
         shared_state = {"final_html": None}
@@ -77,6 +81,7 @@ async def main():
             web_scraper=scraper,
             interaction_tools=webtools,
             state=shared_state,
+            checkpoint=ScraperCheckpoint.for_job(url_input, user_input),
         )
         extractor_agent = ExtractorAgent()
 
@@ -1,4 +1,5 @@
+from .network_archive import NetworkArchive
 from .webscraper import WebScraper
 from .webtools import WebInteractionTools
 
-__all__ = ["WebScraper", "WebInteractionTools"]
+__all__ = ["NetworkArchive", "WebScraper", "WebInteractionTools"]
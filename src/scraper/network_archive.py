@@ -0,0 +1,239 @@
+import asyncio
+import base64
+import gzip
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from zendriver import Tab, cdp
+
+# The archive stores decoded bodies, so encoding headers from the original response no longer apply
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class NetworkArchive:
+    """Records every request/response of a browser tab to an archive, or replays them without network access."""
+
+    MODES = ("record", "replay")
+
+    def __init__(
+        self,
+        path: str,
+        mode: str,
+        body_timeout: float = 10.0,
+        close_timeout: float = 10.0,
+    ):
+        """
+        Initializes the archive. In replay mode the archive is loaded and validated here,
+        so a missing or corrupt file fails before any browser is started.
+
+        Args:
+            path (str): Gzip-compressed JSON file the traffic is written to or read from.
+            mode (str): Either 'record' or 'replay'.
+            body_timeout (float): Seconds to wait for a recorded response body, e.g. on
+                event streams or long-polls that never complete.
+            close_timeout (float): Seconds to wait for in-flight interceptions when closing.
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Invalid network mode '{mode}'. Use one of {self.MODES}.")
+
+        self.path = path
+        self.mode = mode
+        self.body_timeout = body_timeout
+        self.close_timeout = close_timeout
+        self.tab: Optional[Tab] = None
+        self.entries: List[Dict[str, Any]] = []
+        self.stats = {"recorded": 0, "served": 0, "missed": 0}
+        self._pending: Set[asyncio.Task] = set()
+        # Lookup tables from the most to the least specific request key, holding entry positions
+        self._indexes: List[Dict[Tuple, List[int]]] = []
+        # Entries already served, shared by all lookup tables to keep the recorded order
+        self._served: List[bool] = []
+
+        if self.mode == "replay":
+            self._load()
+
+    async def attach(self, tab: Tab):
+        """Starts intercepting the tab's requests. Must be called before the first navigation."""
+        self.tab = tab
+
+        # Every request has to reach the interception layer, in both modes
+        await tab.send(cdp.network.enable())
+        await tab.send(cdp.network.set_cache_disabled(cache_disabled=True))
+
+        stage = (
+            cdp.fetch.RequestStage.RESPONSE
+            if self.mode == "record"
+            else cdp.fetch.RequestStage.REQUEST
+        )
+        tab.add_handler(cdp.fetch.RequestPaused, self._on_request_paused)
+        await tab.send(
+            cdp.fetch.enable(
+                patterns=[
+                    cdp.fetch.RequestPattern(url_pattern="*", request_stage=stage)
+                ]
+            )
+        )
+
+    async def close(self):
+        """
+        Finishes in-flight interceptions and writes the archive when recording.
+        Interceptions still running after `close_timeout` are cancelled; their requests
+        are continued and recorded without a body.
+        """
+        if self._pending:
+            _, pending = await asyncio.wait(
+                set(self._pending), timeout=self.close_timeout
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending, timeout=self.close_timeout)
+        if self.mode == "record":
+            self._save()
+        print(self.report())
+
+    def report(self) -> str:
+        """Summarizes the traffic recorded or replayed in this session."""
+        if self.mode == "record":
+            return f"Network archive: recorded {self.stats['recorded']} responses to {self.path}."
+        return (
+            f"Network archive: served {self.stats['served']} responses from {self.path}, "
+            f"{self.stats['missed']} requests not found in the archive."
+        )
+
+    async def _on_request_paused(self, event: cdp.fetch.RequestPaused):
+        """Handles a paused request. zendriver runs coroutine handlers as tasks on its event loop."""
+        task = asyncio.current_task()
+        self._pending.add(task)
+        try:
+            if self.mode == "record":
+                await self._record(event)
+            else:
+                await self._replay(event)
+        finally:
+            self._pending.discard(task)
+
+    async def _record(self, event: cdp.fetch.RequestPaused):
+        """Stores the paused response and lets it continue to the page."""
+        try:
+            if (
+                event.response_status_code is not None
+                and event.response_error_reason is None
+            ):
+                # Stored before the body arrives, so a cancelled fetch still leaves the entry
+                entry = {
+                    "method": event.request.method,
+                    "url": event.request.url,
+                    "post_data": event.request.post_data,
+                    "status": event.response_status_code,
+                    "headers": [
+                        [header.name, header.value]
+                        for header in event.response_headers or []
+                        if header.name.lower() not in DROPPED_HEADERS
+                    ],
+                    "body": "",
+                }
+                self.entries.append(entry)
+                self.stats["recorded"] += 1
+                entry["body"] = await self._response_body(event.request_id)
+        finally:
+            await self.tab.send(cdp.fetch.continue_request(request_id=event.request_id))
+
+    async def _response_body(self, request_id: cdp.fetch.RequestId) -> str:
+        """Returns the base64-encoded body of a paused response, or '' if unavailable in time."""
+        try:
+            raw_body, is_base64 = await asyncio.wait_for(
+                self.tab.send(cdp.fetch.get_response_body(request_id=request_id)),
+                timeout=self.body_timeout,
+            )
+        except Exception:
+            # Redirects have no body, and streams never finish within the timeout
+            return ""
+        if is_base64:
+            return raw_body
+        return base64.b64encode(raw_body.encode("utf-8")).decode("ascii")
+
+    async def _replay(self, event: cdp.fetch.RequestPaused):
+        """Fulfills the paused request from the archive, failing it if it was never recorded."""
+        entry = self._lookup(event.request)
+        if entry is None:
+            self.stats["missed"] += 1
+            await self.tab.send(
+                cdp.fetch.fail_request(
+                    request_id=event.request_id,
+                    error_reason=cdp.network.ErrorReason.INTERNET_DISCONNECTED,
+                )
+            )
+            return
+
+        self.stats["served"] += 1
+        await self.tab.send(
+            cdp.fetch.fulfill_request(
+                request_id=event.request_id,
+                response_code=entry["status"],
+                response_headers=[
+                    cdp.fetch.HeaderEntry(name=name, value=value)
+                    for name, value in entry["headers"]
+                ],
+                body=entry["body"],
+            )
+        )
+
+    def _lookup(self, request: cdp.network.Request) -> Optional[Dict[str, Any]]:
+        """
+        Finds the recorded response for a request. Repeated identical requests (e.g. polling)
+        are answered in recorded order, and the last response is reused once they run out.
+        """
+        keys = self._keys(request.method, request.url, request.post_data)
+        for index, key in zip(self._indexes, keys):
+            positions = index.get(key)
+            if not positions:
+                continue
+            for position in positions:
+                if not self._served[position]:
+                    self._served[position] = True
+                    return self.entries[position]
+            return self.entries[positions[-1]]
+        return None
+
+    @staticmethod
+    def _keys(method: str, url: str, post_data: Optional[str]) -> List[Tuple]:
+        """Builds request keys: exact match, ignoring the body, then also ignoring the query string."""
+        parts = urlsplit(url)
+        url_without_query = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+        return [
+            (method, url, post_data),
+            (method, url),
+            (method, url_without_query),
+        ]
+
+    def _load(self):
+        """Reads the archive and indexes its responses for replay."""
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+            self._served = [False] * len(self.entries)
+            self._indexes = [defaultdict(list) for _ in range(3)]
+            for position, entry in enumerate(self.entries):
+                keys = self._keys(entry["method"], entry["url"], entry["post_data"])
+                for index, key in zip(self._indexes, keys):
+                    index[key].append(position)
+        except FileNotFoundError:
+            raise
+        except (OSError, EOFError, ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid network archive '{self.path}': {e}") from e
+
+    def _save(self):
+        """Atomically writes the recorded traffic to the archive."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(self.entries, f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
@@ -1,30 +1,175 @@
-from typing import Dict, List, Optional, Type
+import asyncio
+import contextlib
+import itertools
+import json
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
 
 import zendriver as zd
-from zendriver import Browser, Tab
+from zendriver import Browser, Tab, cdp
+
+from .network_archive import NetworkArchive
+
+# Pages that block web storage (data: URLs, error pages, sandboxed documents) export none
+STORAGE_EXPORT_JS = """
+(() => {
+    const read = (getStorage) => {
+        try {
+            return Object.assign({}, getStorage());
+        } catch (error) {
+            return {};
+        }
+    };
+    return JSON.stringify({
+        local: read(() => window.localStorage),
+        session: read(() => window.sessionStorage),
+    });
+})()
+"""
+
+STORAGE_RESTORE_JS = """
+(() => {{
+    const storage = {storage};
+    for (const [key, value] of Object.entries(storage.local || {{}})) {{
+        window.localStorage.setItem(key, value);
+    }}
+    for (const [key, value] of Object.entries(storage.session || {{}})) {{
+        window.sessionStorage.setItem(key, value);
+    }}
+}})()
+"""
+
+# Identifies the current document and counts DOM mutations since it was loaded
+DOM_FINGERPRINT_JS = """
+(() => {
+    if (!window.__scraperDomState) {
+        const state = { id: Math.random().toString(36).slice(2), version: 0 };
+        new MutationObserver(() => { state.version += 1; }).observe(document, {
+            subtree: true, childList: true, attributes: true, characterData: true,
+        });
+        window.__scraperDomState = state;
+    }
+    const { id, version } = window.__scraperDomState;
+    return `${location.href}#${id}:${version}`;
+})()
+"""
+
+# Serializes the matched element in the browser and keeps the result page-side for chunked reads
+# Moves a cut index back by one if it would split a UTF-16 surrogate pair (e.g. an emoji)
+SAFE_CUT_JS = """
+const safeCut = (text, end) => {{
+    if (end <= 0 || end >= text.length) return Math.max(0, Math.min(end, text.length));
+    const code = text.charCodeAt(end - 1);
+    return code >= 0xd800 && code <= 0xdbff ? end - 1 : end;
+}};
+"""
+
+OUTER_HTML_CAPTURE_JS = (
+    """
+(() => {{
+"""
+    + SAFE_CUT_JS
+    + """
+    const element = document.querySelector({selector});
+    if (!element) return null;
+    const outerHTML = element.outerHTML;
+    const html = outerHTML.slice(0, safeCut(outerHTML, {limit}));
+    if (html.length <= {chunk_size}) return {{ length: html.length, chunk: html }};
+    window.__scraperCaptures = window.__scraperCaptures || {{}};
+    window.__scraperCaptures[{capture_id}] = html;
+    return {{ length: html.length, chunk: null }};
+}})()
+"""
+)
+
+# Reads the next chunk of a stashed capture, returning where the following chunk starts
+OUTER_HTML_CHUNK_JS = (
+    """
+(() => {{
+"""
+    + SAFE_CUT_JS
+    + """
+    const html = window.__scraperCaptures[{capture_id}];
+    // A chunk too small for the surrogate pair at its start takes the whole pair
+    const cut = safeCut(html, {start} + {chunk_size});
+    const end = cut > {start} ? cut : {start} + 2;
+    return {{ end: end, chunk: html.slice({start}, end) }};
+}})()
+"""
+)
 
 
 class WebScraper:
     """An asynchronous context manager for web scraping with zendriver."""
 
-    def __init__(self, url: str, headless: bool = True):
+    def __init__(
+        self,
+        url: str,
+        headless: bool = True,
+        speculative: bool = True,
+        settle_timeout: float = 3.0,
+        max_observation_bytes: Optional[int] = None,
+        network_mode: str = "live",
+        archive_path: Optional[str] = None,
+    ):
         """
         Initializes the scraper with a target URL and browser options.
 
         Args:
             url (str): The initial URL to navigate to when the scraper starts.
             headless (bool): Whether to run the browser in headless mode.
+            speculative (bool): Whether to precompute likely observations in the background after each action.
+            settle_timeout (float): Maximum seconds to wait for the DOM to stop changing before prefetching.
+            max_observation_bytes (Optional[int]): Byte cap for HTML returned by `get_body_content`.
+            network_mode (str): 'live' to use the network, 'record' to capture all traffic into
+                `archive_path`, or 'replay' to serve traffic from `archive_path` without network access.
+            archive_path (Optional[str]): Network archive file used by the 'record' and 'replay' modes.
         """
         self.start_url = url
         self.headless = headless
+        self.max_observation_bytes = max_observation_bytes
+        self._capture_ids = itertools.count()
         self.browser: Optional[Browser] = None
         self.tab: Optional[Tab] = None
 
+        # Record/replay of network traffic, None when using the live network
+        self.network_archive: Optional[NetworkArchive] = None
+        if network_mode != "live":
+            if not archive_path:
+                raise ValueError(
+                    f"Network mode '{network_mode}' requires an archive_path."
+                )
+            self.network_archive = NetworkArchive(archive_path, network_mode)
+
+        # Speculative prefetch state: observation key -> (DOM fingerprint, result, compute seconds)
+        self.speculative = speculative
+        self.settle_timeout = settle_timeout
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self._prefetched: Dict[str, Tuple[str, Any, float]] = {}
+        self._prefetch_selectors: List[str] = ["body"]
+        self.prefetch_stats = {"hits": 0, "misses": 0, "seconds_saved": 0.0}
+
     async def __aenter__(self):
         """Starts the browser and navigates to the URL."""
         print("Starting scraper...")
         self.browser = await zd.start(headless=self.headless)
-        self.tab = await self.browser.get(self.start_url)
+        self.tab = await self.browser.get(
+            "about:blank" if self.network_archive else self.start_url
+        )
+
+        # Interception has to be in place before the first real navigation
+        if self.network_archive:
+            await self.network_archive.attach(self.tab)
 
         # Navigate to website URL
         await self.tab.get(self.start_url)
@@ -39,11 +184,63 @@ class WebScraper:
         exc_tb: Optional[object],
     ):
         """Stops the browser, ensuring cleanup."""
+        # Let a cancelled prefetch unwind before its connection is closed
+        prefetch_task = self._prefetch_task
+        self.cancel_prefetch()
+        if prefetch_task:
+            with contextlib.suppress(asyncio.CancelledError):
+                await prefetch_task
+        if self.speculative and (
+            self.prefetch_stats["hits"] or self.prefetch_stats["misses"]
+        ):
+            print(self.prefetch_report())
+        if self.network_archive and self.network_archive.tab:
+            await self.network_archive.close()
         if self.browser:
             print("Stopping scraper...")
             await self.browser.stop()
             print("Scraper stopped successfully.")
 
+    async def export_state(self) -> Dict[str, Any]:
+        """Captures the current URL, cookies and web storage so the session can be restored later."""
+        if not self.tab:
+            raise RuntimeError("Scraper not started.")
+
+        cookies = await self.tab.send(cdp.storage.get_cookies())
+        storage = await self.tab.evaluate(STORAGE_EXPORT_JS)
+        return {
+            "url": self.tab.url,
+            "cookies": [cookie.to_json() for cookie in cookies],
+            "storage": json.loads(storage) if storage else {},
+        }
+
+    async def restore_state(self, state: Dict[str, Any]):
+        """Restores cookies, navigates back to the saved URL and refills web storage."""
+        if not self.tab:
+            raise RuntimeError("Scraper not started.")
+
+        self.cancel_prefetch()
+
+        cookies = []
+        for cookie in state.get("cookies", []):
+            cookie = dict(cookie)
+            # Session cookies report expires=-1, which setCookies would read as already expired
+            if cookie.get("session") or cookie.get("expires", 0) < 0:
+                cookie.pop("expires", None)
+            cookies.append(cdp.network.CookieParam.from_json(cookie))
+        if cookies:
+            await self.tab.send(cdp.storage.set_cookies(cookies=cookies))
+
+        await self.tab.get(state["url"])
+
+        storage = state.get("storage") or {}
+        if storage.get("local") or storage.get("session"):
+            await self.tab.evaluate(
+                STORAGE_RESTORE_JS.format(storage=json.dumps(storage))
+            )
+            # Reload so page scripts pick up the restored storage
+            await self.tab.reload()
+
     async def get_head_content(self) -> str:
         """Get head section of the HTML page."""
 
@@ -52,7 +249,7 @@ class WebScraper:
                 "Scraper not started. Please use 'async with WebScraper(...)'."
             )
 
-        return await self.tab.select("head")
+        return await self.get_outer_html("head") or ""
 
     async def get_body_content(self, css_selector: Optional[str] = None) -> str:
         """
@@ -64,15 +261,131 @@ class WebScraper:
             raise RuntimeError("Scraper not started.")
 
         selector_to_use = css_selector or "body"
+        self._remember_selector(selector_to_use)
+        return await self._observe(
+            f"body:{selector_to_use}",
+            partial(self._read_body_content, selector_to_use),
+        )
 
+    async def _read_body_content(self, selector_to_use: str, wait: bool = True) -> str:
+        """
+        Reads the outer HTML of the element matched by the selector.
+        With `wait`, a missing element gets the same grace period as tab.select.
+        """
         try:
-            element = await self.tab.select(selector_to_use)
-            if element:
-                return str(element)  # Return the element's outer HTML
+            html = await self.get_outer_html(
+                selector_to_use, max_bytes=self.max_observation_bytes, wait=wait
+            )
+            if html is not None:
+                return html
             return f"Error: Element with selector '{selector_to_use}' not found."
         except Exception as e:
             return f"Error getting content for selector '{selector_to_use}': {e}"
 
+    async def get_outer_html(
+        self,
+        css_selector: str,
+        max_bytes: Optional[int] = None,
+        chunk_size: int = 1 << 20,
+        wait: bool = False,
+    ) -> Optional[str]:
+        """
+        Captures the outer HTML of the first element matching the selector straight from the browser,
+        bypassing zendriver's Python element tree.
+
+        Args:
+            css_selector (str): Selector of the element to capture.
+            max_bytes (Optional[int]): Truncates the UTF-8 encoded result to at most this many bytes,
+                including a trailing truncation marker.
+            chunk_size (int): Characters transferred per round trip for large elements.
+            wait (bool): Whether to wait for a late-rendering element, like `tab.select` does.
+
+        Returns:
+            Optional[str]: The outer HTML, or None if no element matches.
+        """
+        chunks = []
+        async for chunk in self.stream_outer_html(
+            css_selector, max_bytes=max_bytes, chunk_size=chunk_size
+        ):
+            chunks.append(chunk)
+
+        if not chunks and wait:
+            # Give late-rendering elements the same grace period as tab.select
+            try:
+                await self.tab.select(css_selector)
+            except asyncio.TimeoutError:
+                return None
+            return await self.get_outer_html(
+                css_selector, max_bytes=max_bytes, chunk_size=chunk_size
+            )
+        if not chunks:
+            return None
+
+        html = chunks[0] if len(chunks) == 1 else "".join(chunks)
+        del chunks
+
+        # A code point never encodes to more than 4 UTF-8 bytes
+        if max_bytes is not None and len(html) * 4 > max_bytes:
+            encoded = html.encode("utf-8")
+            if len(encoded) > max_bytes:
+                # The truncation marker counts towards the cap when it fits in it
+                marker = f"\n<!-- Truncated to {max_bytes} bytes. -->"
+                if len(marker) > max_bytes:
+                    marker = ""
+                html = encoded[: max_bytes - len(marker)].decode(
+                    "utf-8", errors="ignore"
+                )
+                html += marker
+        return html
+
+    async def stream_outer_html(
+        self,
+        css_selector: str,
+        max_bytes: Optional[int] = None,
+        chunk_size: int = 1 << 20,
+    ) -> AsyncIterator[str]:
+        """
+        Yields the outer HTML of the first element matching the selector in chunks, so very large
+        containers never have to cross the DevTools connection as a single message.
+        Nothing is yielded if no element matches.
+        """
+        if not self.tab:
+            raise RuntimeError("Scraper not started.")
+
+        # Characters are an upper bound on bytes, so the byte cap is applied exactly by get_outer_html
+        limit = max_bytes if max_bytes is not None else "Infinity"
+        capture_id = next(self._capture_ids)
+        capture = await self.tab.evaluate(
+            OUTER_HTML_CAPTURE_JS.format(
+                selector=json.dumps(css_selector),
+                limit=limit,
+                chunk_size=chunk_size,
+                capture_id=capture_id,
+            )
+        )
+        if capture is None:
+            return
+        if not isinstance(capture, dict):
+            raise RuntimeError(f"Failed to capture '{css_selector}': {capture}")
+
+        if capture["chunk"] is not None:
+            yield capture["chunk"]
+            return
+
+        try:
+            start = 0
+            while start < capture["length"]:
+                # Offsets are UTF-16 code units, so they are tracked in the browser
+                result = await self.tab.evaluate(
+                    OUTER_HTML_CHUNK_JS.format(
+                        capture_id=capture_id, start=start, chunk_size=chunk_size
+                    )
+                )
+                start = result["end"]
+                yield result["chunk"]
+        finally:
+            await self.tab.evaluate(f"delete window.__scraperCaptures[{capture_id}]")
+
     async def get_current_url(self) -> str:
         """Returns the current URL of the webpage to understand the agent's location."""
         return f"Current URL is: {self.tab.url}"
@@ -82,6 +395,12 @@ class WebScraper:
         Provides a list of all visible interactive elements (links, buttons, inputs, selects).
         Use this to discover what actions are possible on the page, especially if you are unsure of a CSS selector.
         """
+        return await self._observe(
+            "interactive_elements", self._read_interactive_elements
+        )
+
+    async def _read_interactive_elements(self) -> List[Dict[str, str]]:
+        """Collects the visible interactive elements of the page."""
         elements = await self.tab.select_all(
             "a, button, input:not([type=hidden]), select"
         )
@@ -122,3 +441,103 @@ class WebScraper:
             return f"Error: Element with selector '{css_selector}' not found."
         except Exception as e:
             return f"Error reading element '{css_selector}': {e}"
+
+    def start_prefetch(self):
+        """
+        Schedules background computation of the observations the agent is likely to request next.
+        Called after every browser action, while the LLM decides on its next step.
+        """
+        if not self.speculative or not self.tab:
+            return
+        self.cancel_prefetch()
+        self._prefetch_task = asyncio.create_task(self._prefetch())
+
+    def cancel_prefetch(self):
+        """Stops any running prefetch and discards its results, as an action is about to change the page."""
+        if self._prefetch_task and not self._prefetch_task.done():
+            self._prefetch_task.cancel()
+        self._prefetch_task = None
+        self._prefetched.clear()
+
+    def prefetch_report(self) -> str:
+        """Summarizes the hit rate and latency saved by speculative prefetching."""
+        hits = self.prefetch_stats["hits"]
+        lookups = hits + self.prefetch_stats["misses"]
+        hit_rate = hits / lookups if lookups else 0.0
+        return (
+            f"Prefetch: {hits}/{lookups} hits ({hit_rate:.0%}), "
+            f"{self.prefetch_stats['seconds_saved']:.2f}s saved."
+        )
+
+    async def _observe(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Serves a prefetched observation if the DOM is unchanged since it was computed."""
+        if not self.speculative:
+            return await compute()
+
+        cached = self._prefetched.get(key)
+        if cached:
+            fingerprint, result, elapsed = cached
+            if await self._dom_fingerprint() == fingerprint:
+                self.prefetch_stats["hits"] += 1
+                self.prefetch_stats["seconds_saved"] += elapsed
+                return result
+
+        # Only lookups following an action could have been prefetched
+        if self._prefetch_task is not None:
+            self.prefetch_stats["misses"] += 1
+        return await compute()
+
+    async def _prefetch(self):
+        """Waits for the page to settle, then precomputes the likely next observations."""
+        loop = asyncio.get_running_loop()
+        try:
+            fingerprint = await self._wait_for_settle()
+            if not fingerprint:
+                return
+
+            # Speculative reads never wait: a missing element is a valid answer for a
+            # settled DOM, and any later mutation invalidates it through the fingerprint
+            jobs = {"interactive_elements": self._read_interactive_elements}
+            for selector in self._prefetch_selectors:
+                jobs[f"body:{selector}"] = partial(
+                    self._read_body_content, selector, wait=False
+                )
+
+            for key, compute in jobs.items():
+                start_time = loop.time()
+                result = await compute()
+                self._prefetched[key] = (fingerprint, result, loop.time() - start_time)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Speculation is best-effort; the agent falls back to computing on demand
+            return
+
+    async def _wait_for_settle(self, interval: float = 0.2) -> Optional[str]:
+        """Polls the DOM fingerprint until it stops changing, returning the settled fingerprint."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.settle_timeout
+        fingerprint = await self._dom_fingerprint()
+
+        while loop.time() < deadline:
+            await asyncio.sleep(interval)
+            current = await self._dom_fingerprint()
+            if current and current == fingerprint:
+                return current
+            fingerprint = current
+        return None
+
+    async def _dom_fingerprint(self) -> Optional[str]:
+        """Returns an identifier that changes whenever the document or its DOM changes."""
+        try:
+            result = await self.tab.evaluate(DOM_FINGERPRINT_JS)
+        except Exception:
+            return None
+        return result if isinstance(result, str) else None
+
+    def _remember_selector(self, css_selector: str, limit: int = 3):
+        """Keeps the most recently requested selectors as prefetch candidates."""
+        if css_selector in self._prefetch_selectors:
+            self._prefetch_selectors.remove(css_selector)
+        self._prefetch_selectors.insert(0, css_selector)
+        del self._prefetch_selectors[limit:]
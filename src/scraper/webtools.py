@@ -1,15 +1,40 @@
 import asyncio
-from typing import Dict, List
+import functools
+import json
+from typing import Dict, List, Optional
 
 from zendriver import Tab
 
+from .webscraper import WebScraper
+
+
+def _prefetches_after(action):
+    """Invalidates prefetched observations before a browser action and schedules new ones after it."""
+
+    @functools.wraps(action)
+    async def wrapper(self: "WebInteractionTools", *args, **kwargs):
+        if self.scraper:
+            self.scraper.cancel_prefetch()
+        try:
+            return await action(self, *args, **kwargs)
+        finally:
+            if self.scraper:
+                self.scraper.start_prefetch()
+
+    return wrapper
+
 
 class WebInteractionTools:
     """A collection of robust tools for an LLM agent to navigate and scrape dynamic websites."""
 
-    def __init__(self, page: Tab):
+    def __init__(self, page: Tab, scraper: Optional[WebScraper] = None):
         self.page = page
+        # Scraper whose speculative observations are refreshed after each action
+        self.scraper = scraper
+        # Values entered into form fields, keyed by CSS selector, for checkpointing
+        self.form_values: Dict[str, str] = {}
 
+    @_prefetches_after
     async def type_into_element(self, css_selector: str, text: str) -> str:
         """
         Waits for a specific input field to be ready, then types the given text into it.
@@ -18,11 +43,15 @@ class WebInteractionTools:
             element = await self.page.select(css_selector)
             if element:
                 await element.send_keys(text)
+                self.form_values[css_selector] = (
+                    self.form_values.get(css_selector, "") + text
+                )
                 return f"Successfully typed '{text}' into element '{css_selector}'."
             return f"Error: Element with selector '{css_selector}' not found after waiting."
         except Exception as e:
             return f"Error typing into '{css_selector}': {e}"
 
+    @_prefetches_after
     async def click_element(self, css_selector: str) -> str:
         """
         Clicks an element using multiple fallback approaches to improve reliability.
@@ -46,6 +75,7 @@ class WebInteractionTools:
         except Exception as e:
             return f"Error clicking element '{css_selector}': {e}"
 
+    @_prefetches_after
     async def select_dropdown_option(self, css_selector: str, value: str) -> str:
         """
         Selects an option from a <select> dropdown element.
@@ -61,17 +91,47 @@ class WebInteractionTools:
             )
             if option_to_select:
                 await option_to_select.select_option()
+                self.form_values[css_selector] = value
                 return f"Successfully selected option with value '{value}' in dropdown '{css_selector}'."
             else:
                 return f"Error: Option with value '{value}' not found in dropdown '{css_selector}'."
         except Exception as e:
             return f"Error selecting dropdown option: {e}"
 
+    @_prefetches_after
     async def navigate_to_url(self, url: str) -> str:
         """Navigates the browser tab to a new URL."""
         await self.page.get(url)
+        self.form_values.clear()
         return f"Successfully navigated to {url}."
 
+    async def restore_form_values(self, form_values: Dict[str, str]):
+        """
+        Sets previously entered form values on the current page without retyping them.
+        Fields that no longer exist on the page are skipped.
+        """
+        for css_selector, value in form_values.items():
+            await self.page.evaluate(
+                f"""
+                (() => {{
+                    const element = document.querySelector({json.dumps(css_selector)});
+                    if (!element) return;
+                    // Use the native setter so controlled inputs (e.g. React) register the change
+                    const prototype = Object.getPrototypeOf(element);
+                    const setter = Object.getOwnPropertyDescriptor(prototype, "value")?.set;
+                    if (setter) {{
+                        setter.call(element, {json.dumps(value)});
+                    }} else {{
+                        element.value = {json.dumps(value)};
+                    }}
+                    element.dispatchEvent(new Event("input", {{ bubbles: true }}));
+                    element.dispatchEvent(new Event("change", {{ bubbles: true }}));
+                }})()
+                """
+            )
+        self.form_values = dict(form_values)
+
+    @_prefetches_after
     async def scroll_page(self, direction: str) -> str:
         """Scrolls the page. 'direction' must be 'up' or 'down'."""
         if direction.lower() == "down":
@@ -82,6 +142,7 @@ class WebInteractionTools:
             return "Scrolled up."
         return "Error: Invalid scroll direction. Use 'up' or 'down'."
 
+    @_prefetches_after
     async def wait_loading(self, css_selector: str, timeout: int = 30) -> str:
         """
         Waits for a specific element (like a loading spinner or loading message) to disappear from the page.
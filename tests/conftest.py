@@ -5,8 +5,13 @@ import os
 import pytest
 from dotenv import load_dotenv
 
+from src.jobs import job_id
+
 load_dotenv()
 
+# Network mode for end-to-end runs: "live", "record" or "replay"
+NETWORK_MODE = os.environ.get("NETWORK_MODE", "live")
+
 
 class KeyRotator:
     """
@@ -30,6 +35,11 @@ class KeyRotator:
 key_rotator = KeyRotator()
 
 
+def archive_path_for(url: str, task: str, directory: str = "archives") -> str:
+    """Returns the network archive file a test case is recorded to and replayed from."""
+    return os.path.join(directory, f"{job_id(url, task)}.json.gz")
+
+
 def load_test_cases():
     """Loads test cases from the generated JSON file."""
     try:
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+
+from src.scraper import WebScraper
+
+
+def write_fixture(path: Path, rows: int):
+    """Writes a large results page with a table of `rows` rows (roughly 10 nodes per row)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("<html><head><title>Capture benchmark</title></head><body>")
+        f.write("<div id='results'><table class='grid'><tbody>")
+        for i in range(rows):
+            f.write(
+                f"<tr class='row-{i % 2}'><td><a href='/animal/{i}'>AR{i:08d}</a></td>"
+                f"<td>Animal {i}</td><td>{i % 97}</td><td>{i % 89}</td>"
+                f"<td><span title='note'>Ranch &amp; Co. {i % 13}</span></td></tr>"
+            )
+        f.write("</tbody></table></div></body></html>")
+
+
+async def measure(name: str, capture):
+    """Runs one capture, reporting latency, Python peak memory and result size."""
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    html = await capture()
+    elapsed = time.perf_counter() - start_time
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = len(html.encode("utf-8")) if html else 0
+    print(
+        f"{name:<28} {elapsed:>8.3f}s  peak {peak / 2**20:>8.1f} MiB  "
+        f"result {size / 2**20:>7.1f} MiB"
+    )
+
+
+async def run_benchmark(rows: int, max_bytes: int):
+    """Compares zendriver's element serialization with direct outer HTML capture."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fixture = Path(tmp_dir) / "large_page.html"
+        write_fixture(fixture, rows)
+        print(f"Fixture: {rows} rows, {os.path.getsize(fixture) / 2**20:.1f} MiB\n")
+
+        async with WebScraper(
+            fixture.as_uri(), headless=True, speculative=False
+        ) as scraper:
+
+            async def element_tree():
+                return str(await scraper.tab.select("#results"))
+
+            await measure("str(tab.select(...))", element_tree)
+            await measure("get_outer_html", lambda: scraper.get_outer_html("#results"))
+            await measure(
+                "get_outer_html (64 KiB chunks)",
+                lambda: scraper.get_outer_html("#results", chunk_size=1 << 16),
+            )
+            await measure(
+                f"get_outer_html ({max_bytes} B cap)",
+                lambda: scraper.get_outer_html("#results", max_bytes=max_bytes),
+            )
+
+
+if __name__ == "__main__":
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--rows", type=int, default=20000, help="Table rows in the fixture page"
+    )
+    parser.add_argument(
+        "--max-bytes", type=int, default=500_000, help="Byte cap for the capped run"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run_benchmark(args.rows, args.max_bytes))
@@ -2,6 +2,7 @@ import asyncio
 import json
 import os
 from argparse import ArgumentParser
+from typing import Optional
 
 import dspy
 from dotenv import load_dotenv
@@ -14,7 +15,12 @@ API_KEY = os.environ["API_KEY"]
 MODEL_NAME = os.environ["MODEL_NAME"]
 
 
-async def generate_cases(url: str, output_file: str):
+async def generate_cases(
+    url: str,
+    output_file: str,
+    network_mode: str = "live",
+    archive_path: Optional[str] = None,
+):
     """Generate test cases from page URL."""
 
     # Configure DSPy generation model
@@ -23,7 +29,9 @@ async def generate_cases(url: str, output_file: str):
 
     test_generator = TestGeneratorAgent()
     try:
-        async with WebScraper(url, headless=True) as scraper:
+        async with WebScraper(
+            url, headless=True, network_mode=network_mode, archive_path=archive_path
+        ) as scraper:
             initial_html = await scraper.get_body_content()
 
         test_cases_obj = test_generator(html_content=initial_html)
@@ -48,6 +56,13 @@ if __name__ == "__main__":
     parser.add_argument(
         "--output", default="test_cases.json", help="Test case output file"
     )
+    parser.add_argument(
+        "--network-mode",
+        default="live",
+        choices=["live", "record", "replay"],
+        help="Use the live network, record traffic to --archive or replay it from there",
+    )
+    parser.add_argument("--archive", help="Network archive file for record/replay")
     args = parser.parse_args()
 
-    asyncio.run(generate_cases(args.url, args.output))
+    asyncio.run(generate_cases(args.url, args.output, args.network_mode, args.archive))
@@ -0,0 +1,121 @@
+import asyncio
+import gzip
+
+import dspy
+from dspy.utils.dummies import DummyLM
+
+from src.agent.checkpoint import ResumableReAct, ScraperCheckpoint
+
+
+def react_step(tool_name: str, tool_args: dict) -> dict:
+    """Builds a DummyLM response selecting the next tool of a ReAct loop."""
+    return {
+        "next_thought": f"Calling {tool_name}.",
+        "next_tool_name": tool_name,
+        "next_tool_args": tool_args,
+    }
+
+
+def saved_step(idx: int, tool_name: str, observation: str) -> dict:
+    """Builds the trajectory entries of an already completed step."""
+    return {
+        f"thought_{idx}": f"Calling {tool_name}.",
+        f"tool_name_{idx}": tool_name,
+        f"tool_args_{idx}": {},
+        f"observation_{idx}": observation,
+    }
+
+
+def run_react(lm_answers, trajectory=None):
+    """Runs ResumableReAct on a dummy LM, returning the prediction and the reported steps."""
+    calls = []
+
+    async def add_note(text: str) -> str:
+        """Adds a note."""
+        calls.append(text)
+        return f"Noted '{text}'."
+
+    steps = []
+
+    async def on_step(current):
+        steps.append(dict(current))
+
+    react = ResumableReAct("question -> answer", tools=[add_note])
+    with dspy.context(lm=DummyLM(lm_answers)):
+        result = asyncio.run(
+            react.acall(question="Take notes.", trajectory=trajectory, on_step=on_step)
+        )
+    return result, steps, calls
+
+
+def test_checkpoint_save_load_clear(tmp_path):
+    """A checkpoint round-trips through disk and is removed by clear()."""
+    checkpoint = ScraperCheckpoint(str(tmp_path / "nested" / "job.json.gz"))
+    data = {"trajectory": saved_step(0, "add_note", "Noted 'a'."), "form_values": {}}
+
+    assert checkpoint.load() is None
+    checkpoint.save(data)
+    assert checkpoint.load() == data
+
+    checkpoint.clear()
+    assert checkpoint.load() is None
+    checkpoint.clear()
+
+
+def test_truncated_checkpoint_loads_as_none(tmp_path):
+    """A checkpoint cut off mid-write starts the run fresh instead of crashing."""
+    checkpoint = ScraperCheckpoint(str(tmp_path / "job.json.gz"))
+    checkpoint.save({"trajectory": saved_step(0, "add_note", "x" * 10000)})
+
+    with open(checkpoint.path, "rb") as f:
+        content = f.read()
+    with open(checkpoint.path, "wb") as f:
+        f.write(content[: len(content) // 2])
+
+    assert checkpoint.load() is None
+
+
+def test_for_job_is_stable_per_url_and_task():
+    """Re-running the same job resolves to the same checkpoint file."""
+    first = ScraperCheckpoint.for_job("https://example.com", "Get cows")
+    second = ScraperCheckpoint.for_job("https://example.com", "Get cows")
+    other = ScraperCheckpoint.for_job("https://example.com", "Get bulls")
+
+    assert first.path == second.path
+    assert first.path != other.path
+
+
+def test_react_resumes_after_saved_steps():
+    """Resumption continues at the next step index and reports only new steps."""
+    trajectory = saved_step(0, "add_note", "Noted 'a'.")
+    result, steps, calls = run_react(
+        [
+            react_step("add_note", {"text": "b"}),
+            react_step("finish", {}),
+            {"reasoning": "Done.", "answer": "a, b"},
+        ],
+        trajectory=trajectory,
+    )
+
+    assert calls == ["b"]
+    assert [len(step) // 4 for step in steps] == [2, 3]
+    assert result.trajectory["observation_0"] == "Noted 'a'."
+    assert result.trajectory["tool_args_1"] == {"text": "b"}
+    assert result.trajectory["tool_name_2"] == "finish"
+    assert result.answer == "a, b"
+
+
+def test_react_skips_loop_when_finished():
+    """A trajectory saved after 'finish' goes straight to answer extraction."""
+    trajectory = {
+        **saved_step(0, "add_note", "Noted 'a'."),
+        **saved_step(1, "finish", "Completed."),
+    }
+    result, steps, calls = run_react(
+        [{"reasoning": "Done.", "answer": "a"}], trajectory=trajectory
+    )
+
+    assert calls == []
+    assert steps == []
+    assert result.trajectory == trajectory
+    assert result.answer == "a"
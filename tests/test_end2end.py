@@ -4,7 +4,7 @@ from typing import Any
 
 import dspy
 import pytest
-from conftest import key_rotator, load_test_cases
+from conftest import NETWORK_MODE, archive_path_for, key_rotator, load_test_cases
 from dspy.utils.callback import BaseCallback
 
 from src.agent.extractor_agent import ExtractorAgent
@@ -59,6 +59,12 @@ def test_scraping_pipeline(url, task):
 
     print(f"\n🧪 Running test for task: '{task}'")
 
+    archive_path = archive_path_for(url, task)
+    if NETWORK_MODE == "replay" and not os.path.exists(archive_path):
+        pytest.skip(
+            f"No network archive at {archive_path}. Run with NETWORK_MODE=record first."
+        )
+
     logger = ToolLoggingCallback()
     model_name = os.environ["MODEL_NAME"]
     next_api_key = key_rotator.get_next_key()
@@ -72,9 +78,11 @@ def test_scraping_pipeline(url, task):
     )
 
     async def run_pipeline():
-        async with WebScraper(url, headless=True) as scraper:
+        async with WebScraper(
+            url, headless=True, network_mode=NETWORK_MODE, archive_path=archive_path
+        ) as scraper:
             initial_content = await scraper.get_body_content()
-            webtools = WebInteractionTools(scraper.tab)
+            webtools = WebInteractionTools(scraper.tab, scraper=scraper)
             shared_state = {"final_html": None}
 
             scraper_agent = ScraperAgent(
@@ -0,0 +1,175 @@
+import asyncio
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from src.scraper.network_archive import NetworkArchive
+from src.scraper.webscraper import WebScraper
+from src.scraper.webtools import WebInteractionTools
+
+FIXTURE_PAGE = """
+<html>
+  <body>
+    <input id="query" />
+    <button id="search" onclick="search()">Search</button>
+    <div id="results"></div>
+    <script>
+      async function search() {
+        const query = document.querySelector("#query").value;
+        const response = await fetch(`/api/search?q=${encodeURIComponent(query)}`);
+        const rows = await response.json();
+        document.querySelector("#results").innerHTML =
+          `<table>${rows.map((row) => `<tr><td>${row}</td></tr>`).join("")}</table>`;
+      }
+    </script>
+  </body>
+</html>
+"""
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves the fixture page and a search endpoint that is called via XHR."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/":
+            body, content_type = FIXTURE_PAGE.encode("utf-8"), "text/html"
+        elif url.path == "/api/search":
+            query = parse_qs(url.query).get("q", [""])[0]
+            rows = [f"{query} result {i}" for i in range(3)]
+            body, content_type = json.dumps(rows).encode("utf-8"), "application/json"
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+async def search_fixture(url: str, network_mode: str, archive_path: str) -> str:
+    """Runs a form submission on the fixture page and returns the XHR-rendered results."""
+    async with WebScraper(
+        url,
+        headless=True,
+        speculative=False,
+        network_mode=network_mode,
+        archive_path=archive_path,
+    ) as scraper:
+        webtools = WebInteractionTools(scraper.tab)
+        await webtools.type_into_element("#query", "cows")
+        await webtools.click_element("#search")
+        await scraper.tab.select("#results td")
+        return await scraper.get_body_content("#results")
+
+
+def test_record_then_replay(tmp_path):
+    """
+    Records a session against a local server, then replays it with the server stopped.
+    """
+    archive_path = str(tmp_path / "fixture.json.gz")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+    try:
+        recorded = asyncio.run(search_fixture(url, "record", archive_path))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert "cows result 2" in recorded, "Live run did not render the XHR results."
+
+    replayed = asyncio.run(search_fixture(url, "replay", archive_path))
+    assert replayed == recorded, "Replayed results differ from the recorded ones."
+
+
+def test_invalid_archive_fails_before_browser_starts(tmp_path):
+    """Missing or corrupt archives are rejected when the scraper is created."""
+    with pytest.raises(FileNotFoundError):
+        WebScraper(
+            "http://127.0.0.1/",
+            network_mode="replay",
+            archive_path=str(tmp_path / "missing.json.gz"),
+        )
+
+    corrupt_path = tmp_path / "corrupt.json.gz"
+    corrupt_path.write_bytes(gzip.compress(b'[{"url": "http://127.0.0.1/"}]')[:-8])
+    with pytest.raises(ValueError):
+        WebScraper(
+            "http://127.0.0.1/", network_mode="replay", archive_path=str(corrupt_path)
+        )
+
+
+def test_replay_keeps_recorded_order_across_fallbacks(tmp_path):
+    """Responses served through any lookup level are not served again."""
+    archive_path = tmp_path / "polling.json.gz"
+    entries = [
+        {
+            "method": "GET",
+            "url": "http://127.0.0.1/poll?t=1",
+            "post_data": None,
+            "status": 200,
+            "headers": [],
+            "body": body,
+        }
+        for body in ("A1", "A2", "A3")
+    ]
+    with gzip.open(archive_path, "wt", encoding="utf-8") as f:
+        json.dump(entries, f)
+
+    archive = NetworkArchive(str(archive_path), "replay")
+    urls = ["http://127.0.0.1/poll?t=1"] * 2 + ["http://127.0.0.1/poll?t=2"] * 2
+    served = [
+        archive._lookup(SimpleNamespace(method="GET", url=url, post_data=None))["body"]
+        for url in urls
+    ]
+    assert served == ["A1", "A2", "A3", "A3"]
+
+
+def test_record_does_not_hang_on_endless_body(tmp_path):
+    """A response body that never completes is recorded empty and its request continued."""
+    sent = []
+
+    async def send(command):
+        sent.append(command.__name__)
+        if command.__name__ == "get_response_body":
+            await asyncio.sleep(3600)
+
+    event = SimpleNamespace(
+        request_id="stream",
+        request=SimpleNamespace(
+            method="GET", url="http://127.0.0.1/events", post_data=None
+        ),
+        response_status_code=200,
+        response_error_reason=None,
+        response_headers=[],
+    )
+
+    async def record():
+        archive = NetworkArchive(
+            str(tmp_path / "stream.json.gz"),
+            "record",
+            body_timeout=3600,
+            close_timeout=0.1,
+        )
+        archive.tab = SimpleNamespace(send=send)
+        asyncio.create_task(archive._on_request_paused(event))
+        await asyncio.sleep(0.05)
+        await asyncio.wait_for(archive.close(), timeout=5)
+        return archive
+
+    archive = asyncio.run(record())
+    assert archive.entries[0]["body"] == ""
+    assert sent == ["get_response_body", "continue_request"]